@@ -19,25 +19,54 @@ Make sure to set your Garmin Connect credentials as environment variables:
 Or you will be prompted to enter them when running the script.
 """
 
+import getpass
+import json
 import os
 import sys
 import warnings
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import seaborn as sns
+from dateutil.tz import tzlocal
 from garminconnect import Garmin
-from plotly.subplots import make_subplots
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 
-# Set up plotting style
-plt.style.use("seaborn-v0_8")
-sns.set_palette("viridis")
+WEEKDAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+# Sleep-stage minute columns and the dailySleepDTO field (in seconds) each comes from
+SLEEP_MINUTE_FIELDS = {
+    "total_sleep_minutes": "sleepTimeSeconds",
+    "deep_sleep_minutes": "deepSleepSeconds",
+    "light_sleep_minutes": "lightSleepSeconds",
+    "rem_sleep_minutes": "remSleepSeconds",
+    "awake_minutes": "awakeDuration",
+}
+
+# Raw per-day sleep JSON, one directory per Garmin account
+SLEEP_CACHE_DIR = Path.home() / ".cache" / "garmin_sleep"
+
+
+def _local_hour_of_day(timestamps_ms: pd.Series) -> pd.Series:
+    """Local hour of day, to the minute, of epoch-ms timestamps (NaN when missing)."""
+    timestamps_ms = pd.to_numeric(timestamps_ms)
+    times = pd.to_datetime(
+        timestamps_ms.where(timestamps_ms > 0), unit="ms", utc=True
+    ).dt.tz_convert(tzlocal())
+    return times.dt.hour + times.dt.minute / 60
 
 
 class GarminSleepAnalyzer:
@@ -46,7 +75,13 @@ class GarminSleepAnalyzer:
     def __init__(self):
         """Initialize the Garmin sleep analyzer."""
         self.client = None
-        self.sleep_data = []
+        self.cache_dir: Optional[Path] = None
+        self._df = pd.DataFrame()
+        self._nights_requested = 0
+        self._weekly_avg = pd.Series(dtype=float)
+        self._score_mask = np.zeros(0, dtype=bool)
+        self._eff_mask = np.zeros(0, dtype=bool)
+        self._stats: Optional[pd.Series] = None
 
     def authenticate(self) -> bool:
         """
@@ -65,113 +100,240 @@ class GarminSleepAnalyzer:
         if not email:
             email = input("Enter your Garmin Connect email: ")
         if not password:
-            import getpass
-
             password = getpass.getpass("Enter your Garmin Connect password: ")
 
         try:
             self.client = Garmin(email, password)
             self.client.login()
+            self.cache_dir = SLEEP_CACHE_DIR / email
             print("✅ Successfully authenticated with Garmin Connect!")
             return True
         except Exception as e:
             print(f"❌ Authentication failed: {e}")
             return False
 
-    def fetch_sleep_data(self, days_back: int = 90) -> List[Dict[Any, Any]]:
+    def _get_sleep_day(self, date_str: str) -> Optional[Dict[Any, Any]]:
+        """Fetch one day's sleep data, returning None when it is not available."""
+        # Past nights never change once synced, so they are served from the disk
+        # cache; today's record may still be updated by a later sync
+        cache_path = None
+        if self.cache_dir and date_str < date.today().isoformat():
+            cache_path = self.cache_dir / f"{date_str}.json"
+            try:
+                return json.loads(cache_path.read_text())
+            except (OSError, ValueError):
+                pass
+
+        try:
+            sleep_info = self.client.get_sleep_data(date_str)
+        except Exception as e:
+            # Skip days where sleep data is not available
+            print(f"No sleep data for {date_str}: {e}")
+            return None
+
+        # Only cache nights that have synced: an empty record for a recent night
+        # may still be filled in by the next watch sync
+        sleep_dto = (sleep_info or {}).get("dailySleepDTO") or {}
+        if cache_path and sleep_dto.get("sleepTimeSeconds"):
+            try:
+                cache_path.write_text(json.dumps(sleep_info))
+            except OSError:
+                # The cache is only an optimisation; a full or read-only disk is fine
+                pass
+        return sleep_info
+
+    def _days_without_steps(self, start: str, end: str) -> set:
+        """Return the dates in [start, end] that Garmin reports with exactly 0 steps."""
+        try:
+            summaries = self.client.get_daily_steps(start, end)
+        except Exception as e:
+            print(f"Could not check which days have data: {e}")
+            return set()
+        return {
+            summary["calendarDate"]
+            for summary in summaries or []
+            if summary.get("totalSteps") == 0
+        }
+
+    def fetch_sleep_data(
+        self, days_back: int = 90, max_workers: int = 16
+    ) -> pd.DataFrame:
         """
         Fetch sleep data from the last specified number of days.
 
         Args:
             days_back (int): Number of days to look back for sleep data.
+            max_workers (int): Number of days fetched concurrently.
 
         Returns:
-            List[Dict]: List of sleep data dictionaries.
+            pd.DataFrame: One row of sleep metrics per night with data.
         """
         print(f"😴 Fetching sleep data from the last {days_back} days...")
 
-        sleep_data = []
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
 
-        current_date = start_date
+        dates = [start_date + timedelta(days=i) for i in range(days_back + 1)]
+        date_strs = [current_date.strftime("%Y-%m-%d") for current_date in dates]
 
-        while current_date <= end_date:
+        # All requests go through the client's one keep-alive requests.Session; grow
+        # garth's connection pool so no worker has to open a fresh TLS connection
+        # (garminconnect 0.3 dropped garth and manages its own session)
+        garth = getattr(self.client, "garth", None)
+        if hasattr(garth, "configure") and garth.pool_maxsize < max_workers:
+            garth.configure(pool_connections=max_workers, pool_maxsize=max_workers)
+
+        if self.cache_dir:
             try:
-                date_str = current_date.strftime("%Y-%m-%d")
-
-                # Get sleep data for this date
-                sleep_info = self.client.get_sleep_data(date_str)
-
-                if sleep_info and "dailySleepDTO" in sleep_info:
-                    sleep_dto = sleep_info["dailySleepDTO"]
-
-                    # Extract relevant sleep metrics
-                    sleep_record = {
-                        "date": current_date,
-                        "bedtime": None,
-                        "wakeup_time": None,
-                        "total_sleep_minutes": sleep_dto.get("sleepTimeSeconds", 0)
-                        // 60,
-                        "deep_sleep_minutes": sleep_dto.get("deepSleepSeconds", 0)
-                        // 60,
-                        "light_sleep_minutes": sleep_dto.get("lightSleepSeconds", 0)
-                        // 60,
-                        "rem_sleep_minutes": sleep_dto.get("remSleepSeconds", 0) // 60,
-                        "awake_minutes": sleep_dto.get("awakeDuration", 0) // 60,
-                        "sleep_score": sleep_dto.get("overallSleepScore", 0),
-                        "sleep_efficiency": sleep_dto.get("sleepEfficiency", 0),
-                        "sleep_start_timestamp": sleep_dto.get(
-                            "sleepStartTimestampGMT"
-                        ),
-                        "sleep_end_timestamp": sleep_dto.get("sleepEndTimestampGMT"),
-                    }
-
-                    # Convert timestamps to readable times if available
-                    if sleep_record["sleep_start_timestamp"]:
-                        bedtime = datetime.fromtimestamp(
-                            sleep_record["sleep_start_timestamp"] / 1000
-                        )
-                        sleep_record["bedtime"] = bedtime.strftime("%H:%M")
-
-                    if sleep_record["sleep_end_timestamp"]:
-                        wakeup = datetime.fromtimestamp(
-                            sleep_record["sleep_end_timestamp"] / 1000
-                        )
-                        sleep_record["wakeup_time"] = wakeup.strftime("%H:%M")
-
-                    sleep_data.append(sleep_record)
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"Sleep cache disabled: {e}")
+                self.cache_dir = None
+
+        # A day Garmin explicitly reports with 0 steps had the watch off its wrist, so
+        # one range request (in 28-day chunks) finds those days for everything the
+        # disk cache cannot answer. Sleep for a day is the night ending that morning,
+        # and today's steps may not have synced yet, so today and yesterday are always
+        # fetched; a missing or null step total never skips a day
+        today = date.today()
+        recent = {today.isoformat(), (today - timedelta(days=1)).isoformat()}
+        uncached = [
+            date_str
+            for date_str in date_strs
+            if not (
+                self.cache_dir
+                and date_str < today.isoformat()
+                and (self.cache_dir / f"{date_str}.json").exists()
+            )
+        ]
+        skip = set()
+        if uncached:
+            no_steps = self._days_without_steps(uncached[0], uncached[-1])
+            skip = no_steps.intersection(uncached) - recent
+
+        # Each day is a separate blocking HTTPS request, so overlap them. Threads
+        # rather than an asyncio client keep every call on the client's session,
+        # which owns the OAuth token refresh; a few idle worker threads cost nothing
+        # next to the network round-trips
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda date_str: (
+                        None if date_str in skip else self._get_sleep_day(date_str)
+                    ),
+                    date_strs,
+                )
+            )
 
+        # Collect each metric into its own column list rather than a dict per night
+        columns: Dict[str, List[Any]] = {
+            column: []
+            for column in [
+                "date",
+                *SLEEP_MINUTE_FIELDS,
+                "sleep_score",
+                "sleep_efficiency",
+                "sleep_start_timestamp",
+                "sleep_end_timestamp",
+            ]
+        }
+        for current_date, date_str, sleep_info in zip(dates, date_strs, results):
+            if not (sleep_info and "dailySleepDTO" in sleep_info):
+                continue
+            sleep_dto = sleep_info["dailySleepDTO"] or {}
+            # Garmin returns a record with null fields for nights it has no sleep for
+            if not sleep_dto.get("sleepTimeSeconds"):
+                continue
+
+            # Extract relevant sleep metrics, parsing the whole night before any
+            # column is appended so a malformed record cannot misalign the columns
+            try:
+                minutes = [
+                    sleep_dto.get(field, 0) // 60
+                    for field in SLEEP_MINUTE_FIELDS.values()
+                ]
+                sleep_score = sleep_dto.get("overallSleepScore") or 0
+                sleep_efficiency = sleep_dto.get("sleepEfficiency") or 0
             except Exception as e:
-                # Skip days where sleep data is not available
+                # Skip days where sleep data is not usable
                 print(f"No sleep data for {date_str}: {e}")
-                pass
-
-            current_date += timedelta(days=1)
+                continue
+
+            columns["date"].append(current_date)
+            for column, value in zip(SLEEP_MINUTE_FIELDS, minutes):
+                columns[column].append(value)
+            columns["sleep_score"].append(sleep_score)
+            columns["sleep_efficiency"].append(sleep_efficiency)
+            columns["sleep_start_timestamp"].append(
+                sleep_dto.get("sleepStartTimestampGMT")
+            )
+            columns["sleep_end_timestamp"].append(
+                sleep_dto.get("sleepEndTimestampGMT")
+            )
 
-        self.sleep_data = sleep_data
-        print(f"✅ Found sleep data for {len(self.sleep_data)} days")
-        return self.sleep_data
+        self._df = self._build_dataframe(columns)
+        self._nights_requested = len(dates)
+        self._stats = None
+        # Nights with a score / efficiency (Garmin reports 0 when there is none)
+        self._score_mask = self._df["sleep_score"].to_numpy() > 0
+        self._eff_mask = self._df["sleep_efficiency"].to_numpy() > 0
+        if not self._df.empty:
+            # Average sleep per weekday, Monday first; NaN for weekdays without data
+            codes = self._df["day_of_week"].cat.codes.to_numpy()
+            sums = np.bincount(
+                codes, weights=self._df["total_sleep_hours"].to_numpy(), minlength=7
+            )
+            counts = np.bincount(codes, minlength=7)
+            with np.errstate(invalid="ignore"):
+                self._weekly_avg = pd.Series(sums / counts, index=WEEKDAYS)
+        print(f"✅ Found sleep data for {len(self._df)} days")
+        return self._df
+
+    def _build_dataframe(self, columns: Dict[str, List[Any]]) -> pd.DataFrame:
+        """Build the DataFrame shared by the analysis and plotting methods."""
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(columns["date"]),
+                **{
+                    column: np.asarray(columns[column], dtype=np.int32)
+                    for column in SLEEP_MINUTE_FIELDS
+                },
+                "sleep_score": np.asarray(columns["sleep_score"], dtype=np.int32),
+                "sleep_efficiency": np.asarray(
+                    columns["sleep_efficiency"], dtype=np.float64
+                ),
+                # Missing timestamps become NaN
+                "sleep_start_timestamp": np.asarray(
+                    columns["sleep_start_timestamp"], dtype=np.float64
+                ),
+                "sleep_end_timestamp": np.asarray(
+                    columns["sleep_end_timestamp"], dtype=np.float64
+                ),
+            }
+        )
+        df["total_sleep_hours"] = df["total_sleep_minutes"] / 60
+        df["day_of_week"] = pd.Categorical(
+            df["date"].dt.day_name(), categories=WEEKDAYS, ordered=True
+        )
+        df["bedtime_hours"] = _local_hour_of_day(df["sleep_start_timestamp"])
+        df["wakeup_hours"] = _local_hour_of_day(df["sleep_end_timestamp"])
+        return df
 
     def analyze_sleep_duration(self) -> None:
         """Analyze sleep duration patterns."""
         print("\n😴 SLEEP DURATION ANALYSIS")
         print("=" * 50)
 
-        if not self.sleep_data:
+        if self._df.empty:
             print("No sleep data available.")
             return
 
-        # Convert to DataFrame
-        df = pd.DataFrame(self.sleep_data)
-        df["total_sleep_hours"] = df["total_sleep_minutes"] / 60
+        df = self._df
 
         # Calculate statistics
-        avg_sleep = df["total_sleep_hours"].mean()
-        median_sleep = df["total_sleep_hours"].median()
-        min_sleep = df["total_sleep_hours"].min()
-        max_sleep = df["total_sleep_hours"].max()
-        std_sleep = df["total_sleep_hours"].std()
+        avg_sleep, median_sleep, min_sleep, max_sleep, std_sleep = (
+            self._ensure_analyzed()
+        )
 
         print(f"📊 Average sleep duration: {avg_sleep:.1f} hours")
         print(f"📈 Median sleep duration: {median_sleep:.1f} hours")
@@ -179,15 +341,17 @@ class GarminSleepAnalyzer:
         print(f"⬆️ Maximum sleep: {max_sleep:.1f} hours")
         print(f"📏 Standard deviation: {std_sleep:.1f} hours")
 
-        # Sleep quality categories
-        excellent_sleep = len(df[df["total_sleep_hours"] >= 8])
-        good_sleep = len(
-            df[(df["total_sleep_hours"] >= 7) & (df["total_sleep_hours"] < 8)]
-        )
-        fair_sleep = len(
-            df[(df["total_sleep_hours"] >= 6) & (df["total_sleep_hours"] < 7)]
-        )
-        poor_sleep = len(df[df["total_sleep_hours"] < 6])
+        # Sleep quality categories: <6, [6, 7), [7, 8) and 8+ hours
+        quality_counts = pd.cut(
+            df["total_sleep_hours"],
+            bins=[-np.inf, 6, 7, 8, np.inf],
+            labels=["poor", "fair", "good", "excellent"],
+            right=False,
+        ).value_counts()
+        excellent_sleep = quality_counts["excellent"]
+        good_sleep = quality_counts["good"]
+        fair_sleep = quality_counts["fair"]
+        poor_sleep = quality_counts["poor"]
 
         total_nights = len(df)
 
@@ -205,23 +369,47 @@ class GarminSleepAnalyzer:
             f"  😴 Poor (<6 hours): {poor_sleep} nights ({poor_sleep / total_nights * 100:.1f}%)"
         )
 
+    def _ensure_analyzed(self) -> pd.Series:
+        """Sleep duration statistics (hours), computed once per fetch."""
+        if self._stats is None:
+            # Plain numpy reductions skip pandas' per-call overhead on ~90 values
+            hours = self._df["total_sleep_hours"].to_numpy()
+            self._stats = pd.Series(
+                {
+                    "mean": hours.mean(),
+                    "median": np.median(hours),
+                    "min": hours.min(),
+                    "max": hours.max(),
+                    "std": hours.std(ddof=1),
+                }
+            )
+        return self._stats
+
     def analyze_sleep_stages(self) -> None:
         """Analyze sleep stage distribution."""
         print("\n🌙 SLEEP STAGES ANALYSIS")
         print("=" * 50)
 
-        if not self.sleep_data:
+        if self._df.empty:
             print("No sleep data available.")
             return
 
-        # Convert to DataFrame
-        df = pd.DataFrame(self.sleep_data)
+        df = self._df
 
         # Calculate averages for each sleep stage
-        avg_deep = df["deep_sleep_minutes"].mean()
-        avg_light = df["light_sleep_minutes"].mean()
-        avg_rem = df["rem_sleep_minutes"].mean()
-        avg_awake = df["awake_minutes"].mean()
+        stage_means = (
+            df[
+                [
+                    "deep_sleep_minutes",
+                    "light_sleep_minutes",
+                    "rem_sleep_minutes",
+                    "awake_minutes",
+                ]
+            ]
+            .mean()
+            .to_numpy()
+        )
+        avg_deep, avg_light, avg_rem, avg_awake = stage_means
 
         print(
             f"💤 Average Deep Sleep: {avg_deep:.0f} minutes ({avg_deep / 60:.1f} hours)"
@@ -235,11 +423,10 @@ class GarminSleepAnalyzer:
         )
 
         # Calculate percentages
-        total_sleep = avg_deep + avg_light + avg_rem
+        sleep_stages = stage_means[:3]
+        total_sleep = sleep_stages.sum()
         if total_sleep > 0:
-            deep_pct = (avg_deep / total_sleep) * 100
-            light_pct = (avg_light / total_sleep) * 100
-            rem_pct = (avg_rem / total_sleep) * 100
+            deep_pct, light_pct, rem_pct = sleep_stages / total_sleep * 100
 
             print("\n📊 Sleep Stage Distribution:")
             print(f"  💤 Deep Sleep: {deep_pct:.1f}%")
@@ -251,31 +438,30 @@ class GarminSleepAnalyzer:
         print("\n⚡ SLEEP EFFICIENCY ANALYSIS")
         print("=" * 50)
 
-        if not self.sleep_data:
+        if self._df.empty:
             print("No sleep data available.")
             return
 
-        # Convert to DataFrame
-        df = pd.DataFrame(self.sleep_data)
+        df = self._df
 
-        # Filter out zero scores (no data)
-        df_scores = df[df["sleep_score"] > 0]
-        df_efficiency = df[df["sleep_efficiency"] > 0]
+        # Zero scores mean no data, so reduce only the masked values in numpy
+        scores = df["sleep_score"].to_numpy()[self._score_mask]
+        efficiency = df["sleep_efficiency"].to_numpy()[self._eff_mask]
 
-        if not df_scores.empty:
-            avg_score = df_scores["sleep_score"].mean()
-            median_score = df_scores["sleep_score"].median()
-            min_score = df_scores["sleep_score"].min()
-            max_score = df_scores["sleep_score"].max()
+        if scores.size:
+            avg_score = scores.mean()
+            median_score = np.median(scores)
+            min_score = scores.min()
+            max_score = scores.max()
 
             print(f"🎯 Average Sleep Score: {avg_score:.0f}/100")
             print(f"📈 Median Sleep Score: {median_score:.0f}/100")
             print(f"⬇️ Lowest Score: {min_score:.0f}/100")
             print(f"⬆️ Highest Score: {max_score:.0f}/100")
 
-        if not df_efficiency.empty:
-            avg_efficiency = df_efficiency["sleep_efficiency"].mean()
-            median_efficiency = df_efficiency["sleep_efficiency"].median()
+        if efficiency.size:
+            avg_efficiency = efficiency.mean()
+            median_efficiency = np.median(efficiency)
 
             print(f"\n💯 Average Sleep Efficiency: {avg_efficiency:.1f}%")
             print(f"📈 Median Sleep Efficiency: {median_efficiency:.1f}%")
@@ -285,13 +471,15 @@ class GarminSleepAnalyzer:
         print("\n📊 CREATING SLEEP VISUALIZATIONS")
         print("=" * 50)
 
-        if not self.sleep_data:
+        if self._df.empty:
             print("No sleep data available.")
             return
 
-        # Convert to DataFrame
-        df = pd.DataFrame(self.sleep_data)
-        df["total_sleep_hours"] = df["total_sleep_minutes"] / 60
+        # Plotting libraries are only loaded once there is something to plot
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        df = self._df
 
         # Create a comprehensive dashboard
         fig = make_subplots(
@@ -350,7 +538,7 @@ class GarminSleepAnalyzer:
         )
 
         # 3. Sleep Efficiency Trend
-        efficiency_data = df[df["sleep_efficiency"] > 0]
+        efficiency_data = df.loc[self._eff_mask]
         if not efficiency_data.empty:
             fig.add_trace(
                 go.Scatter(
@@ -365,19 +553,10 @@ class GarminSleepAnalyzer:
             )
 
         # 4. Bedtime vs Wake Time (if available)
-        bedtime_data = df.dropna(subset=["bedtime", "wakeup_time"])
+        bedtime_data = df.dropna(subset=["bedtime_hours", "wakeup_hours"])
         if not bedtime_data.empty:
-            # Convert times to hours for plotting
-            bedtime_hours = bedtime_data["bedtime"].apply(
-                lambda x: int(x.split(":")[0]) + int(x.split(":")[1]) / 60
-                if x
-                else None
-            )
-            wakeup_hours = bedtime_data["wakeup_time"].apply(
-                lambda x: int(x.split(":")[0]) + int(x.split(":")[1]) / 60
-                if x
-                else None
-            )
+            bedtime_hours = bedtime_data["bedtime_hours"]
+            wakeup_hours = bedtime_data["wakeup_hours"]
 
             fig.add_trace(
                 go.Scatter(
@@ -404,7 +583,7 @@ class GarminSleepAnalyzer:
             )
 
         # 5. Sleep Score Distribution
-        score_data = df[df["sleep_score"] > 0]
+        score_data = df.loc[self._score_mask]
         if not score_data.empty:
             fig.add_trace(
                 go.Histogram(
@@ -418,22 +597,7 @@ class GarminSleepAnalyzer:
             )
 
         # 6. Weekly Sleep Pattern
-        df["day_of_week"] = df["date"].dt.day_name()
-        weekly_avg = (
-            df.groupby("day_of_week")["total_sleep_hours"]
-            .mean()
-            .reindex(
-                [
-                    "Monday",
-                    "Tuesday",
-                    "Wednesday",
-                    "Thursday",
-                    "Friday",
-                    "Saturday",
-                    "Sunday",
-                ]
-            )
-        )
+        weekly_avg = self._weekly_avg
 
         fig.add_trace(
             go.Bar(
@@ -462,7 +626,8 @@ class GarminSleepAnalyzer:
         fig.update_yaxes(title_text="Hours", row=3, col=2)
 
         # Save and show
-        fig.write_html("sleep_analysis_dashboard.html")
+        # Load plotly.js from the CDN instead of inlining ~3MB of it into the file
+        fig.write_html("sleep_analysis_dashboard.html", include_plotlyjs="cdn")
         fig.show()
 
         print("📊 Interactive sleep dashboard saved as 'sleep_analysis_dashboard.html'")
@@ -472,9 +637,15 @@ class GarminSleepAnalyzer:
 
     def _create_detailed_plots(self, df: pd.DataFrame) -> None:
         """Create detailed matplotlib plots."""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # Set up plotting style
+        plt.style.use("seaborn-v0_8")
+        sns.set_palette("viridis")
 
         # Sleep trends plot
-        plt.figure(figsize=(15, 10))
+        fig = plt.figure(figsize=(15, 10))
 
         # Plot 1: Sleep duration trend
         plt.subplot(2, 2, 1)
@@ -506,7 +677,7 @@ class GarminSleepAnalyzer:
         plt.grid(True, alpha=0.3)
 
         # Plot 3: Sleep efficiency
-        efficiency_data = df[df["sleep_efficiency"] > 0]
+        efficiency_data = df.loc[self._eff_mask]
         if not efficiency_data.empty:
             plt.subplot(2, 2, 3)
             plt.plot(
@@ -524,22 +695,7 @@ class GarminSleepAnalyzer:
 
         # Plot 4: Weekly pattern
         plt.subplot(2, 2, 4)
-        df["day_of_week"] = df["date"].dt.day_name()
-        weekly_avg = (
-            df.groupby("day_of_week")["total_sleep_hours"]
-            .mean()
-            .reindex(
-                [
-                    "Monday",
-                    "Tuesday",
-                    "Wednesday",
-                    "Thursday",
-                    "Friday",
-                    "Saturday",
-                    "Sunday",
-                ]
-            )
-        )
+        weekly_avg = self._weekly_avg
 
         bars = plt.bar(
             weekly_avg.index, weekly_avg.values, color="lightcoral", alpha=0.8
@@ -561,8 +717,9 @@ class GarminSleepAnalyzer:
             )
 
         plt.tight_layout()
-        plt.savefig("detailed_sleep_analysis.png", dpi=300, bbox_inches="tight")
+        plt.savefig("detailed_sleep_analysis.png", dpi=150, bbox_inches="tight")
         plt.show()
+        plt.close(fig)
 
         print("📊 Detailed sleep analysis plots saved as 'detailed_sleep_analysis.png'")
 
@@ -571,20 +728,20 @@ class GarminSleepAnalyzer:
         print("\n📋 SLEEP ANALYSIS REPORT")
         print("=" * 50)
 
-        if not self.sleep_data:
+        if self._df.empty:
             print("No sleep data available for analysis.")
             return
 
-        df = pd.DataFrame(self.sleep_data)
-        df["total_sleep_hours"] = df["total_sleep_minutes"] / 60
+        df = self._df
 
-        print(f"📅 Analysis period: {len(self.sleep_data)} nights")
+        print(f"📅 Analysis period: {self._nights_requested} nights")
         print(
-            f"📊 Data completeness: {len(df[df['total_sleep_hours'] > 0])}/{len(df)} nights with data"
+            f"📊 Data completeness: {len(df)}/{self._nights_requested} nights with data"
         )
 
         # Sleep recommendations
-        avg_sleep = df["total_sleep_hours"].mean()
+        stats = self._ensure_analyzed()
+        avg_sleep = stats["mean"]
 
         print("\n💡 SLEEP INSIGHTS & RECOMMENDATIONS:")
         print("=" * 40)
@@ -599,7 +756,7 @@ class GarminSleepAnalyzer:
             print("😴 You may be sleep-deprived. Consider improving sleep hygiene.")
 
         # Consistency analysis
-        sleep_std = df["total_sleep_hours"].std()
+        sleep_std = stats["std"]
         if sleep_std < 0.5:
             print("📈 Great sleep consistency!")
         elif sleep_std < 1.0:
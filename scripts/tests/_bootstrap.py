@@ -0,0 +1,233 @@
+"""
+Shared helpers for the phase test scripts - HTTP clients and the register/login/group bootstrap
+
+Besides the API's own requirements the phase scripts need the phase-tests dependency group:
+    uv sync --group phase-tests
+"""
+
+import asyncio
+import base64
+import functools
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import httpx
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+# USE_ASGI=1 drives the app in-process instead of over HTTP to localhost:8000
+USE_ASGI = os.getenv("USE_ASGI") == "1"
+
+# HTTP2=1 multiplexes the concurrent read-only checks over one HTTP/2 connection,
+# for deployments behind an HTTP/2 proxy such as Caddy (needs the h2 extra for httpx)
+HTTP2 = os.getenv("HTTP2") == "1"
+
+# Runs background calls such as the immediate sync, shared by every caller
+_BACKGROUND = ThreadPoolExecutor(max_workers=1)
+
+# (connect, read) timeouts so a stuck server fails the run instead of hanging it;
+# the immediate sync talks to Garmin and gets a longer read allowance
+TIMEOUT = (3.05, 10.0)
+SYNC_TIMEOUT = (3.05, 120.0)
+# The same limits for the httpx clients
+HTTPX_TIMEOUT = httpx.Timeout(TIMEOUT[1], connect=TIMEOUT[0])
+
+
+def json_body(response) -> Any:
+    """Decode a response body with orjson rather than the stdlib json module"""
+    return orjson.loads(response.content)
+
+
+def call(session: requests.Session, method: str, url: str, *, expect: int = 200, **kwargs) -> Any | None:
+    """Issue a request and return its decoded body, or report the failure and return None"""
+    response = session.request(method, url, **kwargs)
+    if response.status_code != expect:
+        print(f"   ❌ {method} {url}: {response.status_code} {response.text[:200]}")
+        return None
+    return json_body(response) if response.content else {}
+
+
+def new_session() -> requests.Session:
+    """HTTP session that keeps connections to the API alive between calls"""
+    if USE_ASGI:
+        from fastapi.testclient import TestClient
+        from main import app
+
+        return TestClient(app)
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    session.request = functools.partial(session.request, timeout=TIMEOUT)
+    return session
+
+
+async def run_readonly_checks(base_url: str, authorization: str, paths: list[str]) -> list[tuple[int, Any]]:
+    """GET independent read-only endpoints concurrently, returning (status, body) in order"""
+    if USE_ASGI:
+        from main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, headers={"Authorization": authorization}, timeout=HTTPX_TIMEOUT
+        ) as client:
+            responses = await asyncio.gather(*(client.get(f"{base_url}{path}") for path in paths))
+        return [(r.status_code, json_body(r) if r.status_code == 200 else r.text) for r in responses]
+
+    if HTTP2:
+        limits = httpx.Limits(max_keepalive_connections=4, max_connections=16)
+        async with httpx.AsyncClient(
+            http2=True,
+            base_url=base_url,
+            headers={"Authorization": authorization},
+            limits=limits,
+            timeout=HTTPX_TIMEOUT,
+        ) as client:
+            responses = await asyncio.gather(*(client.get(path) for path in paths))
+        return [(r.status_code, json_body(r) if r.status_code == 200 else r.text) for r in responses]
+
+    connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(sock_connect=TIMEOUT[0], sock_read=TIMEOUT[1])
+    async with aiohttp.ClientSession(
+        headers={"Authorization": authorization}, connector=connector, timeout=timeout
+    ) as client:
+
+        async def fetch(path: str) -> tuple[int, Any]:
+            async with client.get(f"{base_url}{path}") as response:
+                if response.status == 200:
+                    return response.status, await response.json(loads=orjson.loads)
+                return response.status, await response.text()
+
+        return await asyncio.gather(*(fetch(path) for path in paths))
+
+
+def run_pytest() -> int:
+    """Run the pytest version of the phase checks in parallel and return its exit code"""
+    tests = Path(__file__).with_name("test_phase_api.py")
+    return subprocess.call([sys.executable, "-m", "pytest", "-n", "auto", str(tests)])
+
+
+def start_sync(session: requests.Session, base_url: str) -> Future:
+    """Kick off the immediate activity sync on a background thread"""
+    # The in-process TestClient has no network to time out on, and Starlette deprecates
+    # per-request timeouts
+    kwargs = {} if USE_ASGI else {"timeout": SYNC_TIMEOUT}
+    return _BACKGROUND.submit(session.post, f"{base_url}/api/v1/activities/sync/immediate", **kwargs)
+
+
+def wait_ready(base_url: str, timeout: float = 10.0) -> None:
+    """Poll /health until the server answers, giving up silently after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=0.5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+
+
+def load_cached_token(path: Path, base_url: str, email: str) -> str | None:
+    """Return the cached access token for email on base_url if it is valid for at least another minute"""
+    try:
+        cached = json.loads(path.read_text())
+        payload = cached["token"].split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+    if cached.get("base_url") != base_url or cached.get("email") != email:
+        return None
+    if claims.get("exp", 0) <= time.time() + 60:
+        return None
+    return cached["token"]
+
+
+def save_cached_token(path: Path, token: str, base_url: str, email: str) -> None:
+    """Persist the access token so later runs can skip register and login"""
+    # Created owner-only, so the token is never readable by other users, even briefly
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(json.dumps({"token": token, "base_url": base_url, "email": email}))
+
+
+def login(
+    session: requests.Session, base_url: str, user_data: dict, token_cache: Path | None = None
+) -> bool:
+    """Register (ignoring "already exists") and log in, setting the bearer token on the session"""
+    access_token = load_cached_token(token_cache, base_url, user_data["email"]) if token_cache else None
+    if access_token:
+        # A database reset invalidates the token long before its exp claim does
+        response = session.get(
+            f"{base_url}/api/v1/groups/", headers={"Authorization": f"Bearer {access_token}"}
+        )
+        if response.status_code == 401:
+            print("   ℹ️  Cached login token was rejected, logging in again")
+            token_cache.unlink(missing_ok=True)
+            access_token = None
+        else:
+            print("   ✅ Reusing cached login token")
+
+    if not access_token:
+        # Try to register (might fail if user exists)
+        response = session.post(f"{base_url}/api/v1/auth/register", json=user_data)
+        if response.status_code != 200:
+            print(f"   ℹ️  Registration failed (user may exist): {response.status_code}")
+        else:
+            print("   ✅ User registered successfully")
+
+        login_data = {
+            "username": user_data["email"],
+            "password": user_data["password"]
+        }
+
+        token_data = call(session, "POST", f"{base_url}/api/v1/auth/login", data=login_data)
+        if token_data is None:
+            return False
+
+        access_token = token_data["access_token"]
+        if token_cache:
+            save_cached_token(token_cache, access_token, base_url, user_data["email"])
+        print("   ✅ Login successful")
+
+    session.headers["Authorization"] = f"Bearer {access_token}"
+    return True
+
+
+def ensure_group(session: requests.Session, base_url: str, group_data: dict) -> str | None:
+    """Create the test group, falling back to the first existing one; returns its id or None"""
+    response = session.post(f"{base_url}/api/v1/groups/", json=group_data)
+    if response.status_code == 200:
+        group_info = json_body(response)
+        print(f"   ✅ Group created: {group_info['name']} (ID: {group_info['id']})")
+        return group_info["id"]
+
+    # Try to get existing group
+    groups = call(session, "GET", f"{base_url}/api/v1/groups/")
+    if groups is None:
+        return None
+    if not groups:
+        print("   ❌ No groups available")
+        return None
+
+    print(f"   ℹ️  Using existing group: {groups[0]['name']} (ID: {groups[0]['id']})")
+    return groups[0]["id"]
+
+
+def bootstrap(
+    session: requests.Session,
+    base_url: str,
+    user_data: dict,
+    group_data: dict,
+    token_cache: Path | None = None,
+) -> str | None:
+    """Log in and set up the test group in one go; returns the group id, or None on failure"""
+    if not login(session, base_url, user_data, token_cache):
+        return None
+    return ensure_group(session, base_url, group_data)
@@ -0,0 +1,87 @@
+"""
+Session-scoped fixtures for running the phase tests under pytest
+"""
+
+import json
+import os
+
+import pytest
+from filelock import FileLock
+
+# Under pytest the app is driven in-process unless USE_ASGI=0 points the run at a live server
+os.environ.setdefault("USE_ASGI", "1")
+
+from _bootstrap import ensure_group, login, new_session  # noqa: E402
+
+TEST_USER = {
+    "email": "test@example.com",
+    "password": "testpassword123",
+    "full_name": "Test User",
+    "garmin_email": "your-garmin-email@example.com",
+    "garmin_password": "your-garmin-password"
+}
+
+TEST_GROUP = {
+    "name": "Test Fitness Group",
+    "description": "A test group for phase testing",
+    "whatsapp_group_id": "test-whatsapp-group-123",
+    "digest_schedule": "0 8 * * 1"
+}
+
+
+def _once_per_run(tmp_path_factory, name: str, produce):
+    """Call produce once for the whole run, sharing its JSON result between xdist workers"""
+    if "PYTEST_XDIST_WORKER" not in os.environ:
+        return produce()
+
+    # The parent of each worker's basetemp is shared by the run and fresh for every run
+    path = tmp_path_factory.getbasetemp().parent / f"{name}.json"
+    with FileLock(f"{path}.lock"):
+        if path.is_file():
+            return json.loads(path.read_text())
+        value = produce()
+        path.write_text(json.dumps(value))
+        return value
+
+
+@pytest.fixture(scope="session")
+def base_url() -> str:
+    return os.getenv("API_BASE_URL", "http://localhost:8000")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient (or keep-alive requests session with USE_ASGI=0) shared by the whole run"""
+    with new_session() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client, base_url, request, tmp_path_factory) -> dict:
+    """Log in once per pytest run and return the bearer header
+
+    Under pytest -n the first xdist worker logs in and the others reuse its token.
+    The JWT is also kept in the pytest cache directory, so later pytest runs skip
+    register/login while the token is still valid.
+    """
+
+    def log_in() -> str | None:
+        token_cache = request.config.cache.mkdir("phase_tests") / "token.json"
+        if not login(client, base_url, TEST_USER, token_cache):
+            return None
+        return client.headers["Authorization"]
+
+    authorization = _once_per_run(tmp_path_factory, "phase_auth", log_in)
+    if authorization is None:
+        pytest.skip("could not log in as the test user")
+    client.headers["Authorization"] = authorization
+    return {"Authorization": authorization}
+
+
+@pytest.fixture(scope="session")
+def group_id(client, base_url, auth_headers, tmp_path_factory) -> str:
+    """Id of the test group, created once per pytest run"""
+    group_id = _once_per_run(tmp_path_factory, "phase_group", lambda: ensure_group(client, base_url, TEST_GROUP))
+    if group_id is None:
+        pytest.skip("could not set up a test group")
+    return group_id
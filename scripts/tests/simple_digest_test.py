@@ -3,6 +3,8 @@
 Simple Weekly Digest Test - Using existing demo data
 """
 
+import sys
+
 import requests
 import json
 
@@ -159,4 +161,10 @@ def test_digest_with_demo_data():
 
 
 if __name__ == "__main__":
-    test_digest_with_demo_data()
\ No newline at end of file
+    # Block-buffer stdout so the report is written in a few large chunks
+    sys.stdout.reconfigure(line_buffering=False)
+
+    try:
+        test_digest_with_demo_data()
+    finally:
+        sys.stdout.flush()
\ No newline at end of file
@@ -4,6 +4,7 @@ Direct Weekly Digest Test - Bypasses API authentication issues
 """
 
 import asyncio
+import sys
 from datetime import datetime, timedelta
 from sqlalchemy.orm import sessionmaker
 
@@ -67,6 +68,8 @@ async def test_digest_functionality():
         garmin_service = GarminService(db)
         
         try:
+            # stdout is block-buffered; show progress before the sync wait
+            sys.stdout.flush()
             synced_activities = await garmin_service.sync_user_activities(test_user, days_back=14)
             print(f"   ✅ Synced {len(synced_activities)} activities from Garmin Connect")
             
@@ -228,4 +231,10 @@ async def test_digest_functionality():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_digest_functionality())
\ No newline at end of file
+    # Block-buffer stdout so the report is written in a few large chunks
+    sys.stdout.reconfigure(line_buffering=False)
+
+    try:
+        asyncio.run(test_digest_functionality())
+    finally:
+        sys.stdout.flush()
\ No newline at end of file
@@ -5,162 +5,181 @@ Phase 2 Testing Script - Test the complete system functionality
 
 import asyncio
 import json
-import time
-from datetime import datetime
+import os
+import sys
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import requests
 import uvicorn
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func, select
 
 from app.core.database import engine
 from app.models.user import User
 from app.models.group import Group, GroupMembership
 from app.services.garmin_service import GarminService
 
+from _bootstrap import (
+    USE_ASGI,
+    call,
+    ensure_group,
+    json_body,
+    login,
+    new_session,
+    run_pytest,
+    run_readonly_checks,
+    start_sync,
+    wait_ready,
+)
+
+# Window of the stats check; the listing is cut to the same window before reconciling
+STATS_DAYS_BACK = 30
+
+
+def _as_utc(timestamp: str) -> datetime:
+    """Parse an API timestamp, reading naive ones as UTC"""
+    parsed = datetime.fromisoformat(timestamp)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
 
 def test_api_endpoints():
     """Test API endpoints"""
     base_url = "http://localhost:8000"
     
-    print("🚀 Testing Phase 2 Implementation")
-    print("=" * 50)
-    
-    # Test health check
-    print("\n1. Testing Health Check...")
-    response = requests.get(f"{base_url}/health")
-    print(f"Health Check: {response.status_code} - {response.json()}")
-    
-    # Test user registration
-    print("\n2. Testing User Registration...")
-    user_data = {
-        "email": "test@example.com",
-        "password": "testpassword123",
-        "full_name": "Test User",
-        "garmin_email": "your-garmin-email@example.com",
-        "garmin_password": "your-garmin-password"
-    }
+    with new_session() as session:
+        print("🚀 Testing Phase 2 Implementation")
+        print("=" * 50)
     
-    response = requests.post(f"{base_url}/api/v1/auth/register", json=user_data)
-    print(f"User Registration: {response.status_code}")
-    if response.status_code == 200:
-        print(f"✅ User registered successfully")
-    else:
-        print(f"❌ Registration failed: {response.text}")
+        # Test health check
+        print("\n1. Testing Health Check...")
+        health = call(session, "GET", f"{base_url}/health")
+        if health is not None:
+            print(f"Health Check: {health}")
     
-    # Test login
-    print("\n3. Testing User Login...")
-    login_data = {
-        "username": user_data["email"],
-        "password": user_data["password"]
-    }
+        # Test user registration and login
+        print("\n2. Testing User Registration & Login...")
+        user_data = {
+            "email": "test@example.com",
+            "password": "testpassword123",
+            "full_name": "Test User",
+            "garmin_email": "your-garmin-email@example.com",
+            "garmin_password": "your-garmin-password"
+        }
     
-    response = requests.post(f"{base_url}/api/v1/auth/login", data=login_data)
-    if response.status_code == 200:
-        token_data = response.json()
-        access_token = token_data["access_token"]
-        headers = {"Authorization": f"Bearer {access_token}"}
-        print("✅ Login successful")
+        if login(session, base_url, user_data):
+            # The sync is the slowest call and does not depend on the group, so
+            # start it now and overlap it with group setup
+            sync_future = start_sync(session, base_url)
         
-        # Test group creation
-        print("\n4. Testing Group Creation...")
-        group_data = {
-            "name": "Test Fitness Group",
-            "description": "A test group for Phase 2 testing",
-            "whatsapp_group_id": "test-whatsapp-group-123",
-            "digest_schedule": "0 8 * * 1"
-        }
+            # Test group creation
+            print("\n3. Testing Group Creation...")
+            group_data = {
+                "name": "Test Fitness Group",
+                "description": "A test group for Phase 2 testing",
+                "whatsapp_group_id": "test-whatsapp-group-123",
+                "digest_schedule": "0 8 * * 1"
+            }
+        
+            group_id = ensure_group(session, base_url, group_data)
+        
+            # Test activity sync (immediate)
+            print("\n4. Testing Immediate Activity Sync...")
+            # stdout is block-buffered; show progress before the sync wait
+            sys.stdout.flush()
+            response = sync_future.result()
+            print(f"Activity Sync: {response.status_code}")
+            if response.status_code == 200:
+                sync_result = json_body(response)
+                print(f"✅ Synced {sync_result['synced_activities']} activities")
+                for activity in sync_result.get('activities', []):
+                    print(f"   - {activity['activity_type']}: {activity['activity_name']}")
+            else:
+                print(f"⚠️  Activity sync failed (possibly no Garmin credentials): {response.text}")
+        
+            # The remaining checks are read-only, so issue them all at once
+            paths = ["/api/v1/groups/", "/api/v1/activities/", f"/api/v1/activities/stats?days_back={STATS_DAYS_BACK}"]
+            if group_id is not None:
+                paths.append(f"/api/v1/groups/{group_id}/members")
+            results = asyncio.run(run_readonly_checks(base_url, session.headers["Authorization"], paths))
+            (groups_status, groups), (activities_status, activities), (stats_status, stats) = results[:3]
         
-        response = requests.post(f"{base_url}/api/v1/groups/", json=group_data, headers=headers)
-        print(f"Group Creation: {response.status_code}")
-        if response.status_code == 200:
-            group_info = response.json()
-            print(f"✅ Group created: {group_info['name']} (ID: {group_info['id']})")
-            
             # Test listing groups
             print("\n5. Testing Group Listing...")
-            response = requests.get(f"{base_url}/api/v1/groups/", headers=headers)
-            if response.status_code == 200:
-                groups = response.json()
+            if groups_status == 200:
                 print(f"✅ Found {len(groups)} group(s)")
                 for group in groups:
                     print(f"   - {group['name']} ({group['member_count']} members)")
-            
+        
             # Test group members
-            print("\n6. Testing Group Members...")
-            group_id = group_info['id']
-            response = requests.get(f"{base_url}/api/v1/groups/{group_id}/members", headers=headers)
-            if response.status_code == 200:
-                members = response.json()
-                print(f"✅ Group has {len(members)} member(s)")
-                for member in members:
-                    print(f"   - {member['full_name']} ({member['role']})")
+            if group_id is not None:
+                print("\n6. Testing Group Members...")
+                members_status, members = results[3]
+                if members_status == 200:
+                    print(f"✅ Group has {len(members)} member(s)")
+                    for member in members:
+                        print(f"   - {member['full_name']} ({member['role']})")
         
-        # Test activity sync (immediate)
-        print("\n7. Testing Immediate Activity Sync...")
-        response = requests.post(f"{base_url}/api/v1/activities/sync/immediate", headers=headers)
-        print(f"Activity Sync: {response.status_code}")
-        if response.status_code == 200:
-            sync_result = response.json()
-            print(f"✅ Synced {sync_result['synced_activities']} activities")
-            for activity in sync_result.get('activities', []):
-                print(f"   - {activity['activity_type']}: {activity['activity_name']}")
-        else:
-            print(f"⚠️  Activity sync failed (possibly no Garmin credentials): {response.text}")
+            # Test activity listing
+            print("\n7. Testing Activity Listing...")
+            if activities_status == 200:
+                print(f"✅ Found {len(activities)} activities")
+                for activity in activities[:3]:  # Show first 3
+                    print(f"   - {activity['activity_type']}: {activity.get('distance_km', 0):.2f}km, {activity.get('duration_minutes', 0)}min")
         
-        # Test activity listing
-        print("\n8. Testing Activity Listing...")
-        response = requests.get(f"{base_url}/api/v1/activities/", headers=headers)
-        if response.status_code == 200:
-            activities = response.json()
-            print(f"✅ Found {len(activities)} activities")
-            for activity in activities[:3]:  # Show first 3
-                print(f"   - {activity['activity_type']}: {activity.get('distance_km', 0):.2f}km, {activity.get('duration_minutes', 0)}min")
+            # Test activity stats
+            print("\n8. Testing Activity Statistics...")
+            if stats_status == 200:
+                print(f"✅ Activity Stats:")
+                print(f"   - Total Activities: {stats['total_activities']}")
+                print(f"   - Total Distance: {stats['total_distance_km']:.2f} km")
+                print(f"   - Total Duration: {stats['total_duration_minutes']} minutes")
+                print(f"   - Activity Types: {list(stats['activity_types'].keys())}")
         
-        # Test activity stats
-        print("\n9. Testing Activity Statistics...")
-        response = requests.get(f"{base_url}/api/v1/activities/stats", headers=headers)
-        if response.status_code == 200:
-            stats = response.json()
-            print(f"✅ Activity Stats:")
-            print(f"   - Total Activities: {stats['total_activities']}")
-            print(f"   - Total Distance: {stats['total_distance_km']:.2f} km")
-            print(f"   - Total Duration: {stats['total_duration_minutes']} minutes")
-            print(f"   - Activity Types: {list(stats['activity_types'].keys())}")
-    
-    else:
-        print(f"❌ Login failed: {response.text}")
+            # Cross-check the server totals against the raw activity list
+            if activities_status == 200 and stats_status == 200:
+                print("\n9. Reconciling Statistics with Activity Listing...")
+                # The stats only cover the last STATS_DAYS_BACK days (UTC), the listing everything
+                cutoff = datetime.now(timezone.utc) - timedelta(days=STATS_DAYS_BACK)
+                windowed = [a for a in activities if _as_utc(a['start_time']) >= cutoff]
+                count = len(windowed)
+                distances = np.fromiter((a.get('distance_km') or 0.0 for a in windowed), dtype=np.float64, count=count)
+                durations = np.fromiter((a.get('duration_minutes') or 0 for a in windowed), dtype=np.float64, count=count)
+                # Listed durations are floored to whole minutes and the server may round
+                # distances to 2 dp, so allow up to a minute per activity and 0.01 km.
+                # This assumes /activities/ returns every activity in one page
+                if np.isclose(distances.sum(), stats['total_distance_km'], rtol=0, atol=0.01) and np.isclose(
+                    durations.sum(), stats['total_duration_minutes'], rtol=0, atol=count
+                ):
+                    print("✅ Stats match the activity listing")
+                else:
+                    print(f"⚠️  Listing totals differ from stats: {distances.sum():.2f} km, {durations.sum():.0f} minutes")
     
-    print("\n" + "=" * 50)
-    print("📊 Phase 2 Testing Complete!")
+        print("\n" + "=" * 50)
+        print("📊 Phase 2 Testing Complete!")
 
 
-def test_database_models():
+def test_database_models(sample_size: int = 3):
     """Test database models and relationships"""
     print("\n🗄️  Testing Database Models...")
     
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
-    
-    try:
-        # Test user count
-        user_count = db.query(User).count()
+    # Read-only diagnostic, so use Core rows on a plain connection rather than the ORM
+    with engine.connect() as conn:
+        # Count users, groups and memberships in a single round trip
+        user_count, group_count, membership_count = conn.execute(
+            select(
+                select(func.count()).select_from(User).scalar_subquery(),
+                select(func.count()).select_from(Group).scalar_subquery(),
+                select(func.count()).select_from(GroupMembership).scalar_subquery(),
+            )
+        ).one()
         print(f"✅ Users in database: {user_count}")
-        
-        # Test group count
-        group_count = db.query(Group).count()
         print(f"✅ Groups in database: {group_count}")
-        
-        # Test group memberships
-        membership_count = db.query(GroupMembership).count()
         print(f"✅ Group memberships: {membership_count}")
         
         # Show sample user data
-        users = db.query(User).limit(3).all()
-        for user in users:
-            print(f"   - User: {user.email} (Active: {user.is_active}, Last sync: {user.last_sync_at})")
-        
-    finally:
-        db.close()
+        users = conn.execute(select(User.email, User.is_active, User.last_sync_at).limit(sample_size))
+        for email, is_active, last_sync_at in users:
+            print(f"   - User: {email} (Active: {is_active}, Last sync: {last_sync_at})")
 
 
 def run_development_server():
@@ -170,23 +189,34 @@ def run_development_server():
     print("API Documentation: http://localhost:8000/docs")
     print("Use Ctrl+C to stop the server")
     
+    # uvicorn picks uvloop + httptools when they are installed, keeping per-request
+    # server overhead low while the tests hammer it, and falls back to asyncio + h11
+    # otherwise (e.g. on Windows); DEV_RELOAD=1 restores auto-reload, UVICORN_WORKERS
+    # scales out
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        reload=os.getenv("DEV_RELOAD") == "1",
+        loop="auto",
+        http="auto",
+        log_level=os.getenv("UVICORN_LOG", "warning"),
+        workers=int(os.getenv("UVICORN_WORKERS", "1"))
     )
 
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == "server":
         run_development_server()
+    elif len(sys.argv) > 1 and sys.argv[1] == "pytest":
+        sys.exit(run_pytest())
     else:
-        # Wait a moment for server to be ready if it's running
-        time.sleep(2)
+        # Block-buffer stdout so the report is written in a few large chunks
+        sys.stdout.reconfigure(line_buffering=False)
+
+        # Wait for the server to be ready if it's running
+        if not USE_ASGI:
+            wait_ready("http://localhost:8000")
         
         try:
             test_api_endpoints()
@@ -194,4 +224,6 @@ if __name__ == "__main__":
         except requests.exceptions.ConnectionError:
             print("❌ Could not connect to the API server.")
             print("   Start the server first with: python test_phase2.py server")
-            print("   Or use Docker: docker-compose up")
\ No newline at end of file
+            print("   Or use Docker: docker-compose up")
+        finally:
+            sys.stdout.flush()
\ No newline at end of file
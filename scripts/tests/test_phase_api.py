@@ -0,0 +1,66 @@
+"""
+Phase 2/3 API checks as independent pytest tests
+
+Runs in-process against the ASGI app by default and shards across CPUs with:
+    pytest -n auto scripts/tests/test_phase_api.py
+Set USE_ASGI=0 (and optionally API_BASE_URL) to target a running server instead.
+"""
+
+from _bootstrap import json_body
+
+
+def test_health(client, base_url):
+    response = client.get(f"{base_url}/health")
+    assert response.status_code == 200
+
+
+def test_list_groups(client, base_url, auth_headers, group_id):
+    response = client.get(f"{base_url}/api/v1/groups/", headers=auth_headers)
+    assert response.status_code == 200
+    groups = json_body(response)
+    assert any(group["id"] == group_id for group in groups)
+    assert all("member_count" in group for group in groups)
+
+
+def test_group_members(client, base_url, auth_headers, group_id):
+    response = client.get(f"{base_url}/api/v1/groups/{group_id}/members", headers=auth_headers)
+    assert response.status_code == 200
+    members = json_body(response)
+    assert members
+    assert all({"full_name", "role"} <= member.keys() for member in members)
+
+
+def test_list_activities(client, base_url, auth_headers):
+    response = client.get(f"{base_url}/api/v1/activities/", headers=auth_headers)
+    assert response.status_code == 200
+    assert isinstance(json_body(response), list)
+
+
+def test_activity_stats(client, base_url, auth_headers):
+    response = client.get(f"{base_url}/api/v1/activities/stats?days_back=30", headers=auth_headers)
+    assert response.status_code == 200
+    stats = json_body(response)
+    assert {"total_activities", "total_distance_km", "total_duration_minutes", "total_calories"} <= stats.keys()
+    assert isinstance(stats["activity_types"], dict)
+
+
+def test_digest_preview(client, base_url, auth_headers, group_id):
+    response = client.get(f"{base_url}/api/v1/digest/{group_id}/preview", headers=auth_headers)
+    assert response.status_code == 200
+    preview = json_body(response)
+    assert preview["formatted_message"]
+    assert {"total_activities", "total_distance_km", "total_duration_hours"} <= preview["summary"].keys()
+
+
+def test_previous_week_preview(client, base_url, auth_headers, group_id):
+    response = client.get(f"{base_url}/api/v1/digest/{group_id}/preview?week_offset=1", headers=auth_headers)
+    assert response.status_code == 200
+    assert "week_number" in json_body(response)["period"]
+
+
+def test_digest_send(client, base_url, auth_headers, group_id):
+    response = client.post(f"{base_url}/api/v1/digest/{group_id}/send", headers=auth_headers)
+    assert response.status_code == 200
+    result = json_body(response)
+    assert result["digest_id"]
+    assert result["whatsapp_status"]
@@ -4,19 +4,23 @@ Minimal test server for the dashboard with test data
 Includes only dashboard endpoints without complex dependencies
 """
 
+import functools
+import itertools
 import os
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, Boolean, Index, and_, case, event, func, insert, select, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from pydantic import BaseModel
 
 # Create FastAPI app
@@ -32,17 +36,33 @@ app.add_middleware(
 )
 
 # Database setup
-DATABASE_URL = "sqlite:///./test_garmin.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DATABASE_URL = "sqlite+aiosqlite:///./test_garmin.db"
+# The queue pool is explicit: aiosqlite only defaults to it for file databases from
+# SQLAlchemy 2.0.38, and the NullPool used before rejects the sizing arguments
+engine = create_async_engine(
+    DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=5,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a writer holds the database
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Database Models
 class User(Base):
@@ -80,6 +100,11 @@ class Activity(Base):
     def duration_minutes(self) -> int:
         return self.duration // 60 if self.duration else 0
 
+# Weekly range scans filter on user_id and start_time; the start_time-only index
+# serves range queries across all users
+Index("ix_activity_user_time", Activity.user_id, Activity.start_time)
+Index("ix_activity_start_time", Activity.start_time)
+
 # Pydantic Models
 class UserWeeklyStats(BaseModel):
     name: str
@@ -97,6 +122,7 @@ class WeeklyDashboard(BaseModel):
     year: int
     users: List[UserWeeklyStats]
     totals: Dict[str, Any]
+    top_performers: Dict[str, UserWeeklyStats] = {}
     previous_week_comparison: Dict[str, Any] = {}
     monthly_comparison: Dict[str, Any] = {}
     year_to_date_comparison: Dict[str, Any] = {}
@@ -109,35 +135,75 @@ class WhatsAppDigest(BaseModel):
     message: str
     summary_stats: Dict[str, Any]
 
+RUNNING_TYPES = frozenset({"running", "run", "jogging"})
+
+@functools.cache
+def _title(activity_type: str) -> str:
+    """Display label for an activity type, e.g. trail_running -> Trail Running"""
+    return activity_type.replace('_', ' ').title()
+
 # API Routes
 @app.get("/")
 async def root():
     return {"message": "Garmin Dashboard Test Server", "status": "running"}
 
+# Checked once at import rather than on every dashboard hit
+DASHBOARD_PATH = os.path.join("static", "dashboard.html")
+DASHBOARD_EXISTS = os.path.exists(DASHBOARD_PATH)
+
 @app.get("/fake-sporters")
 async def fake_sporters_dashboard():
     """Public dashboard endpoint"""
-    static_path = os.path.join("static", "dashboard.html")
-    if os.path.exists(static_path):
-        return FileResponse(static_path)
+    if DASHBOARD_EXISTS:
+        return FileResponse(DASHBOARD_PATH)
     else:
-        return {"error": "Dashboard not found", "path": static_path}
+        return {"error": "Dashboard not found", "path": DASHBOARD_PATH}
+
+WeekRange = Tuple[datetime, datetime, int, int]
+
+def compute_week_range(week_offset: int) -> WeekRange:
+    """Return (week_start, week_end, week_number, year) for the week `week_offset` weeks back"""
+    return _week_range(week_offset, date.today().toordinal())
+
+@functools.lru_cache(maxsize=128)
+def _week_range(week_offset: int, today_ordinal: int) -> WeekRange:
+    # Keyed on today's date, so a new day (and with it a new week) gets a fresh entry
+    today = date.fromordinal(today_ordinal)
+    week_start = datetime.combine(today - timedelta(days=today.weekday() + (week_offset * 7)), datetime.min.time())
+    return week_start, week_start + timedelta(days=7), week_start.isocalendar()[1], week_start.year
+
+# Weekly dashboards and digests keyed by (week_offset, latest activity created_at), so a
+# new activity invalidates the entry and the TTL bounds staleness across week boundaries
+_dashboard_cache: TTLCache = TTLCache(maxsize=64, ttl=60)
+
+async def _data_version(db: AsyncSession) -> Optional[datetime]:
+    """Latest activity created_at, which changes whenever an activity is stored"""
+    return await db.scalar(select(func.max(Activity.created_at)))
+
+async def build_weekly_dashboard(
+    db: AsyncSession, week_offset: int, week_range: Optional[WeekRange] = None
+) -> Dict[str, Any]:
+    """Compute the weekly dashboard, reusing a cached result while the data is unchanged"""
+    key = (week_offset, await _data_version(db))
+    dashboard = _dashboard_cache.get(key)
+    if dashboard is None:
+        dashboard = _dashboard_cache[key] = await _compute_weekly_dashboard(
+            db, week_range or compute_week_range(week_offset)
+        )
+    return dashboard
 
 @app.get("/api/v1/dashboard/weekly", response_model=WeeklyDashboard)
 async def get_weekly_dashboard(
     week_offset: int = Query(0, description="Weeks back from current week (0 = current week)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get weekly activity dashboard for all users"""
-    
-    # Calculate week period
-    today = datetime.now()
-    week_start = today - timedelta(days=today.weekday() + (week_offset * 7))
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_end = week_start + timedelta(days=7)
-    
-    # Get all active users
-    users = db.query(User).filter(User.is_active == True).all()
+    return await build_weekly_dashboard(db, week_offset)
+
+async def _compute_weekly_dashboard(db: AsyncSession, week_range: WeekRange) -> Dict[str, Any]:
+    # Plain dicts throughout: response_model validates the route's result once at
+    # serialization, and the digest reads the fields without building models
+    week_start, week_end, week_number, year = week_range
     
     user_stats = []
     totals = {
@@ -147,19 +213,49 @@ async def get_weekly_dashboard(
         "total_activities": 0,
         "active_users": 0
     }
+    # Ranked on the same keys as the final sort so ties resolve as before
+    most_steps_user, most_steps_key = None, None
     
-    for user in users:
-        # Get user's activities for the week
-        activities = (
-            db.query(Activity)
-            .filter(Activity.user_id == user.id)
-            .filter(Activity.start_time >= week_start)
-            .filter(Activity.start_time < week_end)
-            .all()
+    # One query: active users LEFT JOIN the week's activities, aggregated per (user,
+    # activity type); steps and the active-calories fallback come out of the
+    # processed_metrics JSON. Users without activities get a single row whose
+    # activity_type is NULL, and each user's rows arrive contiguously. Users come out
+    # in insertion (rowid) order: the bulk seed gives several the same created_at
+    steps_expr = func.coalesce(func.json_extract(Activity.processed_metrics, "$.steps"), 0)
+    calories_expr = case(
+        (func.coalesce(Activity.calories, 0) != 0, Activity.calories),
+        else_=func.coalesce(func.json_extract(Activity.processed_metrics, "$.active_calories"), 0),
+    )
+    type_totals = await db.execute(
+        select(
+            User.id,
+            User.full_name,
+            User.email,
+            Activity.activity_type,
+            func.count(Activity.id).label("count"),
+            func.sum(Activity.distance).label("distance"),
+            func.sum(steps_expr).label("steps"),
+            func.sum(calories_expr).label("active_calories"),
+        )
+        .outerjoin(
+            Activity,
+            and_(
+                Activity.user_id == User.id,
+                Activity.start_time >= week_start,
+                Activity.start_time < week_end,
+            ),
         )
+        .where(User.is_active == True)
+        .group_by(User.id, Activity.activity_type)
+        .order_by(text("users.rowid"))
+    )
+    
+    for _, user_rows in itertools.groupby(type_totals, key=lambda row: row.id):
+        user_type_totals = list(user_rows)
+        user = user_type_totals[0]
         
-        if not activities:
-            user_stats.append(UserWeeklyStats(
+        if user.activity_type is None:
+            user_stat = dict(
                 name=user.full_name,
                 email=user.email,
                 total_steps=0,
@@ -167,64 +263,69 @@ async def get_weekly_dashboard(
                 active_calories=0,
                 total_activities=0,
                 activities_breakdown={}
-            ))
+            )
+            user_stats.append(user_stat)
+            if most_steps_user is None:
+                most_steps_user, most_steps_key = user_stat, (0, 0, 0)
             continue
         
         # Calculate user metrics
         total_steps = 0
         running_distance = 0.0
         active_calories = 0
+        total_activities = 0
         activities_breakdown = {}
         
-        for activity in activities:
-            # Extract steps from processed_metrics
-            if activity.processed_metrics and 'steps' in activity.processed_metrics:
-                total_steps += activity.processed_metrics.get('steps', 0)
+        for row in user_type_totals:
+            total_steps += row.steps
             
             # Calculate running distance
-            if activity.activity_type.lower() in ['running', 'run', 'jogging']:
-                running_distance += activity.distance_km if activity.distance_km else 0.0
+            distance = row.distance
+            if distance and row.activity_type.lower() in RUNNING_TYPES:
+                running_distance += distance / 1000.0
             
-            # Active calories
-            if activity.calories:
-                active_calories += activity.calories
-            elif activity.processed_metrics and 'active_calories' in activity.processed_metrics:
-                active_calories += activity.processed_metrics.get('active_calories', 0)
+            active_calories += row.active_calories
+            total_activities += row.count
             
             # Activity breakdown
-            activity_type = activity.activity_type.replace('_', ' ').title()
-            activities_breakdown[activity_type] = activities_breakdown.get(activity_type, 0) + 1
+            activity_type = _title(row.activity_type)
+            activities_breakdown[activity_type] = activities_breakdown.get(activity_type, 0) + row.count
         
-        user_stat = UserWeeklyStats(
+        user_stat = dict(
             name=user.full_name,
             email=user.email,
             total_steps=int(total_steps),
             running_distance_km=round(running_distance, 2),
             active_calories=int(active_calories),
-            total_activities=len(activities),
+            total_activities=total_activities,
             activities_breakdown=activities_breakdown
         )
         
         user_stats.append(user_stat)
         
         # Add to totals
-        totals["total_steps"] += user_stat.total_steps
-        totals["total_running_distance"] += user_stat.running_distance_km
-        totals["total_active_calories"] += user_stat.active_calories
-        totals["total_activities"] += user_stat.total_activities
-        if user_stat.total_activities > 0:
+        totals["total_steps"] += user_stat["total_steps"]
+        totals["total_running_distance"] += user_stat["running_distance_km"]
+        totals["total_active_calories"] += user_stat["active_calories"]
+        totals["total_activities"] += user_stat["total_activities"]
+        if user_stat["total_activities"] > 0:
             totals["active_users"] += 1
+        
+        steps_key = (user_stat["total_steps"], user_stat["total_activities"], user_stat["active_calories"])
+        if most_steps_key is None or steps_key > most_steps_key:
+            most_steps_user, most_steps_key = user_stat, steps_key
     
     # Sort users by total activity (most active first)
-    user_stats.sort(key=lambda x: (x.total_activities, x.total_steps, x.active_calories), reverse=True)
+    user_stats.sort(key=lambda x: (x["total_activities"], x["total_steps"], x["active_calories"]), reverse=True)
     
-    return WeeklyDashboard(
+    return dict(
         week_start=week_start.isoformat(),
         week_end=week_end.isoformat(),
-        week_number=week_start.isocalendar()[1],
-        year=week_start.year,
+        week_number=week_number,
+        year=year,
         users=user_stats,
         totals=totals,
+        top_performers={"most_active": user_stats[0], "most_steps": most_steps_user} if user_stats else {},
         previous_week_comparison={},  # Simplified for testing
         monthly_comparison={},
         year_to_date_comparison={}
@@ -233,75 +334,80 @@ async def get_weekly_dashboard(
 @app.get("/api/v1/whatsapp/weekly", response_model=WhatsAppDigest)
 async def get_whatsapp_digest(
     week_offset: int = Query(0, description="Weeks back from current week (0 = current week)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate WhatsApp-formatted weekly digest"""
+    key = ("whatsapp", week_offset, await _data_version(db))
+    digest = _dashboard_cache.get(key)
+    if digest is None:
+        week_range = compute_week_range(week_offset)
+        dashboard_data = await build_weekly_dashboard(db, week_offset, week_range)
+        digest = _dashboard_cache[key] = _build_whatsapp_digest(dashboard_data, week_range)
+    return digest
+
+def _summary_line(rank: int, user: Dict[str, Any]) -> str:
+    """One INDIVIDUAL SUMMARY entry: the ranked name line plus an optional detail line"""
+    rank_emoji = ["🥇", "🥈", "🥉"][rank] if rank < 3 else f"{rank+1}."
+    line = f"{rank_emoji} *{user['name']}*: {user['total_activities']} activities"
+    if user['total_steps'] > 0 or user['active_calories'] > 0:
+        parts = []
+        if user['total_steps'] > 0:
+            parts.append(f"{user['total_steps']:,} steps")
+        if user['running_distance_km'] > 0:
+            parts.append(f"{user['running_distance_km']:.1f}km run")
+        if user['active_calories'] > 0:
+            parts.append(f"{user['active_calories']:,} cal")
+        line += f"\n    {' • '.join(parts)}"
+    return line
+
+def _build_whatsapp_digest(dashboard_data: Dict[str, Any], week_range: WeekRange) -> WhatsAppDigest:
+    week_start, week_end, week_number, year = week_range
+    totals = dashboard_data['totals']
+    users = dashboard_data['users']
     
-    # Calculate week period
-    today = datetime.now()
-    week_start = today - timedelta(days=today.weekday() + (week_offset * 7))
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_end = week_start + timedelta(days=7)
-    
-    # Get dashboard data
-    dashboard_data = await get_weekly_dashboard(week_offset, db)
+    # Top performers and individual summary (top 5)
+    performers = ""
+    if users:
+        top_user = dashboard_data['top_performers']['most_active']
+        most_steps_user = dashboard_data['top_performers']['most_steps']
+        summary = "\n".join([_summary_line(i, user) for i, user in enumerate(users[:5])])
+        performers = (
+            "🏆 *TOP PERFORMERS*\n"
+            f"🥇 Most Active: *{top_user['name']}* ({top_user['total_activities']} activities)\n"
+            f"👟 Most Steps: *{most_steps_user['name']}* ({most_steps_user['total_steps']:,} steps)\n"
+            "\n"
+            "👥 *INDIVIDUAL SUMMARY*\n"
+            f"{summary}\n"
+            "\n"
+        )
     
     # Create WhatsApp message
-    message_parts = []
-    message_parts.append("🏃‍♂️ *FAKE SPORTERS WEEKLY DIGEST* 🏃‍♀️")
-    message_parts.append(f"📅 Week {dashboard_data.week_number}, {dashboard_data.year}")
-    message_parts.append("")
-    
-    # Group totals
-    message_parts.append("📊 *GROUP TOTALS*")
-    message_parts.append(f"👟 Total Steps: *{dashboard_data.totals['total_steps']:,}*")
-    message_parts.append(f"🏃‍♂️ Running Distance: *{dashboard_data.totals['total_running_distance']:.1f} km*")
-    message_parts.append(f"🔥 Active Calories: *{dashboard_data.totals['total_active_calories']:,}*")
-    message_parts.append(f"⚡ Total Activities: *{dashboard_data.totals['total_activities']}*")
-    message_parts.append(f"👥 Active Members: *{dashboard_data.totals['active_users']}*")
-    message_parts.append("")
-    
-    # Top performers
-    if dashboard_data.users:
-        message_parts.append("🏆 *TOP PERFORMERS*")
-        top_user = dashboard_data.users[0]
-        message_parts.append(f"🥇 Most Active: *{top_user.name}* ({top_user.total_activities} activities)")
-        
-        # Find user with most steps
-        most_steps_user = max(dashboard_data.users, key=lambda x: x.total_steps)
-        message_parts.append(f"👟 Most Steps: *{most_steps_user.name}* ({most_steps_user.total_steps:,} steps)")
-        
-        message_parts.append("")
-    
-    # Individual summary
-    if dashboard_data.users:
-        message_parts.append("👥 *INDIVIDUAL SUMMARY*")
-        for i, user in enumerate(dashboard_data.users[:5]):  # Top 5
-            rank_emoji = ["🥇", "🥈", "🥉"][i] if i < 3 else f"{i+1}."
-            message_parts.append(f"{rank_emoji} *{user.name}*: {user.total_activities} activities")
-            if user.total_steps > 0 or user.active_calories > 0:
-                parts = []
-                if user.total_steps > 0:
-                    parts.append(f"{user.total_steps:,} steps")
-                if user.running_distance_km > 0:
-                    parts.append(f"{user.running_distance_km:.1f}km run")
-                if user.active_calories > 0:
-                    parts.append(f"{user.active_calories:,} cal")
-                message_parts.append(f"    {' • '.join(parts)}")
-        message_parts.append("")
-    
-    message_parts.append("💪 *Keep up the great work, everyone!*")
-    message_parts.append("📱 View dashboard: localhost:8001/fake-sporters")
+    message = (
+        "🏃‍♂️ *FAKE SPORTERS WEEKLY DIGEST* 🏃‍♀️\n"
+        f"📅 Week {week_number}, {year}\n"
+        "\n"
+        "📊 *GROUP TOTALS*\n"
+        f"👟 Total Steps: *{totals['total_steps']:,}*\n"
+        f"🏃‍♂️ Running Distance: *{totals['total_running_distance']:.1f} km*\n"
+        f"🔥 Active Calories: *{totals['total_active_calories']:,}*\n"
+        f"⚡ Total Activities: *{totals['total_activities']}*\n"
+        f"👥 Active Members: *{totals['active_users']}*\n"
+        "\n"
+        f"{performers}"
+        "💪 *Keep up the great work, everyone!*\n"
+        "📱 View dashboard: localhost:8001/fake-sporters"
+    )
     
-    return WhatsAppDigest(
+    # Trusted, already-typed values; response_model validates once at the response boundary
+    return WhatsAppDigest.model_construct(
         week_start=week_start.isoformat(),
         week_end=week_end.isoformat(),
-        week_number=week_start.isocalendar()[1],
-        year=week_start.year,
-        message="\n".join(message_parts),
+        week_number=week_number,
+        year=year,
+        message=message,
         summary_stats={
-            "totals": dashboard_data.totals,
-            "user_count": len([u for u in dashboard_data.users if u.total_activities > 0])
+            "totals": totals,
+            "user_count": len([u for u in users if u['total_activities'] > 0])
         }
     )
 
@@ -312,29 +418,26 @@ if os.path.exists("static"):
 # Create tables and load test data
 @app.on_event("startup")
 async def startup_event():
-    Base.metadata.create_all(bind=engine)
-    
-    # Check if we already have data
-    db = SessionLocal()
-    try:
-        if db.query(User).count() == 0:
+    # Schema and seed data go in one transaction as plain Core executemany inserts
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        
+        # Check if we already have data
+        if await conn.scalar(select(func.count()).select_from(User)) == 0:
             print("Loading test data...")
             
             # Create test users and activities (same as in test_dashboard_local.py)
             users = [
-                User(email="john@test.com", full_name="John Runner", garmin_email="enc", garmin_password="enc"),
-                User(email="sarah@test.com", full_name="Sarah Cyclist", garmin_email="enc", garmin_password="enc"),
-                User(email="mike@test.com", full_name="Mike Walker", garmin_email="enc", garmin_password="enc"),
-                User(email="emma@test.com", full_name="Emma Swimmer", garmin_email="enc", garmin_password="enc"),
-                User(email="alex@test.com", full_name="Alex Hiker", garmin_email="enc", garmin_password="enc")
+                dict(id=uuid.uuid4(), email="john@test.com", full_name="John Runner", garmin_email="enc", garmin_password="enc"),
+                dict(id=uuid.uuid4(), email="sarah@test.com", full_name="Sarah Cyclist", garmin_email="enc", garmin_password="enc"),
+                dict(id=uuid.uuid4(), email="mike@test.com", full_name="Mike Walker", garmin_email="enc", garmin_password="enc"),
+                dict(id=uuid.uuid4(), email="emma@test.com", full_name="Emma Swimmer", garmin_email="enc", garmin_password="enc"),
+                dict(id=uuid.uuid4(), email="alex@test.com", full_name="Alex Hiker", garmin_email="enc", garmin_password="enc")
             ]
             
-            for user in users:
-                db.add(user)
-            db.commit()
-            
-            for user in users:
-                db.refresh(user)
+            # Ids are assigned client-side, so nothing needs reading back after the INSERT
+            await conn.execute(insert(User), users)
+            user_ids = [user["id"] for user in users]
             
             # Create activities for current week
             today = datetime.now()
@@ -345,8 +448,8 @@ async def startup_event():
             # John's running activities
             for i in range(5):
                 activity_date = week_start + timedelta(days=i)
-                activities.append(Activity(
-                    user_id=users[0].id,
+                activities.append(dict(
+                    user_id=user_ids[0],
                     garmin_activity_id=f"john_run_{i}",
                     activity_type="running",
                     activity_name=f"Morning Run {i+1}",
@@ -360,8 +463,8 @@ async def startup_event():
             # Sarah's cycling activities  
             for i in range(4):
                 activity_date = week_start + timedelta(days=i)
-                activities.append(Activity(
-                    user_id=users[1].id,
+                activities.append(dict(
+                    user_id=user_ids[1],
                     garmin_activity_id=f"sarah_cycle_{i}",
                     activity_type="cycling",
                     activity_name=f"Evening Ride {i+1}",
@@ -375,8 +478,8 @@ async def startup_event():
             # Mike's walking activities
             for i in range(7):
                 activity_date = week_start + timedelta(days=i)
-                activities.append(Activity(
-                    user_id=users[2].id,
+                activities.append(dict(
+                    user_id=user_ids[2],
                     garmin_activity_id=f"mike_walk_{i}",
                     activity_type="walking",
                     activity_name=f"Daily Walk {i+1}",
@@ -391,8 +494,8 @@ async def startup_event():
             for i in range(3):
                 activity_date = week_start + timedelta(days=i * 2)
                 activities.extend([
-                    Activity(
-                        user_id=users[3].id,
+                    dict(
+                        user_id=user_ids[3],
                         garmin_activity_id=f"emma_swim_{i}",
                         activity_type="swimming",
                         activity_name=f"Pool Session {i+1}",
@@ -402,8 +505,8 @@ async def startup_event():
                         calories=400 + (i * 50),
                         processed_metrics={"steps": 0, "active_calories": 400 + (i * 50)}
                     ),
-                    Activity(
-                        user_id=users[3].id,
+                    dict(
+                        user_id=user_ids[3],
                         garmin_activity_id=f"emma_run_{i}",
                         activity_type="running",
                         activity_name=f"Recovery Run {i+1}",
@@ -417,8 +520,8 @@ async def startup_event():
             
             # Alex's hiking activities
             weekend_activities = [
-                Activity(
-                    user_id=users[4].id,
+                dict(
+                    user_id=user_ids[4],
                     garmin_activity_id="alex_hike_1",
                     activity_type="hiking",
                     activity_name="Mountain Trail",
@@ -429,8 +532,8 @@ async def startup_event():
                     elevation_gain=800,
                     processed_metrics={"steps": 18000, "active_calories": 1200}
                 ),
-                Activity(
-                    user_id=users[4].id,
+                dict(
+                    user_id=user_ids[4],
                     garmin_activity_id="alex_hike_2",
                     activity_type="hiking",
                     activity_name="Forest Loop",
@@ -444,16 +547,12 @@ async def startup_event():
             ]
             activities.extend(weekend_activities)
             
-            for activity in activities:
-                db.add(activity)
-            
-            db.commit()
+            # An executemany takes its columns from the first row, so every row needs every key
+            activities = [{"elevation_gain": None, **activity} for activity in activities]
+            await conn.execute(insert(Activity), activities)
             print(f"✅ Loaded {len(users)} users and {len(activities)} activities")
         else:
             print("✅ Test data already exists")
-            
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     import uvicorn